@@ -1,9 +1,28 @@
 import streamlit as st
-from groq import Groq
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from groq import Groq, APIError
 import os
-import json
-from PIL import Image, ImageDraw
-import pytesseract
+from abc import ABC, abstractmethod
+import threading
+import time
+import queue
+from concurrent.futures import ThreadPoolExecutor, wait
+from diskcache import Cache
+import orjson
+import re
+import hashlib
+import io
+import numpy as np
+from PIL import Image, ImageChops, ImageDraw, ImageFilter, ImageFont
+
+# OCR already runs in parallel across strips and screenshots, so one OpenMP
+# thread per Tesseract call avoids oversubscribing the CPU. This limit is
+# process-wide: it also caps every other OpenMP user, including the torch
+# embedder behind the semantic cache, at one thread. That is an acceptable
+# cost because the embedder only ever encodes one short prompt at a time.
+# Must be set before any OpenMP library loads; override it per deployment
+# if needed.
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
 
 # ================= PAGE CONFIG =================
 st.set_page_config(
@@ -15,70 +34,469 @@ st.title("🧩 INTERPRETER")
 st.caption("We explain what your app is trying to say.")
 
 # ================= API =================
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-llm = Groq(api_key=GROQ_API_KEY)
+MODEL = "llama-3.1-8b-instant"
+# The JSON answer rarely goes past ~300 tokens
+MAX_TOKENS = 350
+# Matches the pipeline timeout so a stuck request frees its worker thread
+LLM_TIMEOUT = 30
 
-# ================= INPUT =================
-uploaded_image = st.file_uploader(
-    "Upload a screenshot of the problem",
-    type=["png", "jpg", "jpeg"]
-)
+# The app talks to the model only through ChatClient.stream, so a backend
+# with explicit prompt caching can replace Groq without touching interpret()
+class ChatClient(ABC):
+    @abstractmethod
+    def stream(self, system, user, max_tokens=MAX_TOKENS):
+        ...
 
-user_note = st.text_area(
-    "What were you trying to do? (optional)",
-    placeholder="Example: Sending money, logging in, opening app",
-    height=90
-)
+class GroqChatClient(ChatClient):
+    def __init__(self, api_key):
+        self.client = Groq(api_key=api_key, timeout=LLM_TIMEOUT)
 
-# ================= SYSTEM PROMPT =================
-SYSTEM_PROMPT = """
-You are INTERPRETER — an AI that translates software screens into human meaning.
+    def stream(self, system, user, max_tokens=MAX_TOKENS):
+        # The system prompt is sent as one unchanging block so provider-side
+        # prefix caching can match it
+        stream = self.client.chat.completions.create(
+            model=MODEL,
+            messages=[
+                {"role": "system", "content": system},
+                {"role": "user", "content": user}
+            ],
+            temperature=0,
+            max_tokens=max_tokens,
+            response_format={"type": "json_object"},
+            stream=True
+        )
+        for chunk in stream:
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
 
-Your job:
-- Understand what the screen is saying
-- Explain it in calm, simple language
-- Reduce user confusion and panic
-- Tell the user what to do next
+@st.cache_resource
+def get_llm():
+    # One client per process keeps its HTTPS connection pool warm across reruns
+    return GroqChatClient(os.getenv("GROQ_API_KEY"))
 
-Rules:
-- Use ONLY what is visible on the screen or written by the user
-- Do NOT use technical terms
-- Do NOT guess hidden system behavior
-- Speak like a helpful human, not tech support
+# ================= DISK CACHE =================
+# Shared by every session and kept across restarts
+DISK_CACHE_DIR = "./vessy_cache"
+DISK_CACHE_TTL = 7 * 24 * 3600
 
-Return ONLY valid JSON in this format:
+@st.cache_resource
+def get_disk_cache():
+    return Cache(DISK_CACHE_DIR, size_limit=5 << 30)
 
+# ================= INPUT =================
+# Inside a form the script only reruns on submit, not on every edit
+with st.form("interpret"):
+    uploaded_images = st.file_uploader(
+        "Upload screenshots of the problem",
+        type=["png", "jpg", "jpeg"],
+        accept_multiple_files=True
+    )
+
+    user_note = st.text_area(
+        "What were you trying to do? (optional)",
+        placeholder="Example: Sending money, logging in, opening app",
+        height=90
+    )
+
+    submitted = st.form_submit_button("Explain this screen")
+
+# ================= SYSTEM PROMPT =================
+SYSTEM_PROMPT = """Return ONLY valid JSON in this format:
 {
   "screen_type": "payment | banking | system | app | unknown",
-  "plain_meaning": "One clear sentence explaining what this screen means",
+  "plain_meaning": "One clear sentence: what this screen means",
   "what_is_happening": "Short calm explanation in simple words",
   "risk_level": "none | low | medium | high",
-  "what_to_do_now": [
-    "step 1",
-    "step 2",
-    "step 3"
-  ],
+  "what_to_do_now": ["step 1", "step 2", "step 3"],
   "confidence": "high | medium | low",
   "visual_clues": [
-    {
-      "label": "What this part of the screen indicates",
-      "severity": "info | warning"
-    }
+    {"screenshot": 1, "label": "What this part of the screen indicates", "severity": "info | warning"}
   ]
 }
+
+You are INTERPRETER: explain software screens in plain human words.
+- Calm, simple language; reduce panic; say what to do next
+- Use ONLY what is on the screen or written by the user
+- No technical terms; do not guess hidden system behavior
+- Several screenshots may be given; explain them together and set
+  "screenshot" on each clue to the number of the screenshot it belongs to
 """
 
+# Fixed start of every user message; keep anything request-specific after it
+# so the provider's prefix cache matches as much as possible
+USER_PREAMBLE = (
+    "### Instruction\n"
+    "Interpret the following screen and return JSON per the format.\n\n"
+    "### Evidence\n"
+)
+
+# ================= LLM CACHE =================
+# Finished text fields that are worth showing before the rest arrives
+_EARLY_FIELDS = re.compile(r'"(?:plain_meaning|what_is_happening)"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+def _json_string(escaped):
+    try:
+        return orjson.loads(f'"{escaped}"')
+    except orjson.JSONDecodeError:
+        return escaped
+
+class StreamProgress:
+    # Written by the worker streaming the answer, drawn by the script thread;
+    # workers never touch the page themselves
+    def __init__(self):
+        self.text = ""
+
+def _stream_answer(system, user, max_tokens, progress=None):
+    # The JSON is only parsed once complete, but each finished text field
+    # is reported as soon as its closing quote arrives
+    buffer = io.StringIO()
+    n = 0
+    for delta in get_llm().stream(system, user, max_tokens):
+        buffer.write(delta)
+        n += 1
+        if progress is not None:
+            early = [_json_string(v) for v in _EARLY_FIELDS.findall(buffer.getvalue())]
+            progress.text = "\n\n".join(early + [f"_Received {n} tokens…_"])
+
+    return buffer.getvalue()
+
+def prompt_key(content):
+    return hashlib.blake2b((MODEL + SYSTEM_PROMPT + content).encode(), digest_size=16).hexdigest()
+
+def _disk_key(prompt_key):
+    return f"llm:{prompt_key}"
+
+@st.cache_data(ttl=3600, max_entries=512, show_spinner=False)
+def _cached_interpret(prompt_key, _content, _max_tokens, _progress=None):
+    # Keyed on prompt_key only; temperature=0 makes the answer deterministic.
+    # Memory first, then the shared disk cache, then Groq. Failures raise,
+    # so they are never cached.
+    disk_key = _disk_key(prompt_key)
+    result = get_disk_cache().get(disk_key)
+    if result is None:
+        result = parse_answer(_stream_answer(SYSTEM_PROMPT, _content, _max_tokens, _progress))
+        get_disk_cache().set(disk_key, result, expire=DISK_CACHE_TTL)
+    return result
+
+# ================= SEMANTIC CACHE =================
+SEMANTIC_THRESHOLD = 0.93
+SEMANTIC_MAX_ENTRIES = 256
+
+# The semantic cache is optional: any failure here only turns it off and
+# never fails the request
+@st.cache_resource(show_spinner=False)
+def _get_embedder():
+    # A failed load is cached as None, so it is not retried on every request
+    try:
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
+    except Exception:
+        return None
+
+def _embed(text):
+    embedder = _get_embedder()
+    if embedder is None:
+        return None
+    try:
+        return embedder.encode([text], normalize_embeddings=True)[0]
+    except Exception:
+        return None
+
+def _semantic_lookup(vec):
+    if vec is None:
+        return None
+    try:
+        vecs = st.session_state.get("cache_vecs")
+        if vecs is None or not len(vecs):
+            return None
+
+        # Embeddings are normalized, so the dot product is the cosine similarity
+        sims = vecs @ vec
+        best = int(sims.argmax())
+        if sims[best] > SEMANTIC_THRESHOLD:
+            return st.session_state["cache_results"][best]
+    except Exception:
+        pass
+    return None
+
+def _semantic_store(vec, result):
+    if vec is None:
+        return
+    try:
+        vecs = st.session_state.get("cache_vecs")
+        results = st.session_state.get("cache_results", [])
+
+        vecs = vec[None, :] if vecs is None else np.vstack([vecs, vec])
+        results = results + [result]
+
+        # FIFO eviction
+        st.session_state["cache_vecs"] = vecs[-SEMANTIC_MAX_ENTRIES:]
+        st.session_state["cache_results"] = results[-SEMANTIC_MAX_ENTRIES:]
+    except Exception:
+        pass
+
 # ================= OCR =================
+# Longest side kept for OCR and display; plenty for reading screen text
+MAX_IMAGE_SIDE = 1600
+OCR_WORKERS = min(4, os.cpu_count() or 1)
+# Local-mean thresholding: blur radius and how much darker than its
+# surroundings a pixel must be to count as text
+THRESHOLD_RADIUS = 5
+THRESHOLD_OFFSET = 10
+_TEXT_LUT = [0 if p > THRESHOLD_OFFSET else 255 for p in range(256)]
+# Tall screenshots are read as overlapping horizontal strips in parallel
+OCR_TILE_MIN_HEIGHT = 1200
+OCR_TILE_OVERLAP = 40
+
+@st.cache_resource(show_spinner=False)
+def _get_tess_pool():
+    # In-process engines keep the language model loaded between calls.
+    # An engine is not thread-safe, so each OCR call borrows one from here.
+    # Imported on first use so note-only sessions never load it.
+    from tesserocr import PyTessBaseAPI, PSM, OEM
+
+    pool = queue.Queue()
+    for _ in range(OCR_WORKERS):
+        # LSTM engine only, and treat the screen as one block of text
+        pool.put(PyTessBaseAPI(psm=PSM.SINGLE_BLOCK, oem=OEM.LSTM_ONLY))
+    return pool
+
+def _tess_text(image):
+    pool = _get_tess_pool()
+    api = pool.get()
+    try:
+        api.SetImage(image)
+        return api.GetUTF8Text()
+    finally:
+        pool.put(api)
+
+def _read_tiles(image, n):
+    w, h = image.size
+    strips = [
+        image.crop((0, max(0, i * h // n - OCR_TILE_OVERLAP), w, (i + 1) * h // n))
+        for i in range(n)
+    ]
+    with ThreadPoolExecutor(max_workers=n) as ex:
+        texts = list(ex.map(_with_ctx(_tess_text), strips))
+
+    # The overlap band can be read twice; drop repeated neighbouring lines
+    lines = []
+    for text in texts:
+        for line in text.splitlines():
+            line = line.strip()
+            if line and (not lines or line != lines[-1]):
+                lines.append(line)
+    return "\n".join(lines)
+
+def _two_tones(gray):
+    # Every 8th pixel each way is enough to spot a two-tone screen; returns
+    # its two tones, or None otherwise. A single tone means the sample
+    # missed the text, so there is no safe cut to make.
+    sample = gray.resize((max(1, gray.width // 8), max(1, gray.height // 8)), Image.NEAREST)
+    colors = sample.getcolors(maxcolors=2)
+    if colors is None or len(colors) != 2:
+        return None
+    return [tone for _, tone in colors]
+
+def _split_tones(gray, tones):
+    # Cut halfway between the two tones, not at a fixed 128: grey-on-white
+    # or dark-on-darker screens have both tones on one side of 128
+    mid = (min(tones) + max(tones)) // 2
+    return gray.point([255 if p > mid else 0 for p in range(256)], "1")
+
+def _adaptive_threshold(gray):
+    # Comparing each pixel with its own neighbourhood copes with shadows and
+    # gradients that defeat a single global threshold
+    local_mean = gray.filter(ImageFilter.GaussianBlur(THRESHOLD_RADIUS))
+    darker = ImageChops.subtract(local_mean, gray)
+
+    # Median filtering before the threshold drops the same isolated specks
+    # as filtering after it, and lets threshold + 1-bit conversion be one pass
+    darker = darker.filter(ImageFilter.MedianFilter(3))
+    return darker.point(_TEXT_LUT, "1")
+
 def read_screen(image):
+    # Tesseract time grows with pixel count; thumbnail only ever shrinks
+    image.thumbnail((MAX_IMAGE_SIDE, MAX_IMAGE_SIDE), Image.LANCZOS)
+    if image.mode not in ("1", "L"):
+        image = image.convert("L")
+
+    # A 1-bit image lets Tesseract skip its own thresholding pass
+    if image.mode == "L":
+        tones = _two_tones(image)
+        if tones is not None:
+            image = _split_tones(image, tones)
+        else:
+            image = _adaptive_threshold(image)
+
     try:
-        text = pytesseract.image_to_string(image)
+        if image.height > OCR_TILE_MIN_HEIGHT and OCR_WORKERS > 1:
+            text = _read_tiles(image, OCR_WORKERS)
+        else:
+            text = _tess_text(image)
         return text.strip() if text.strip() else None
     except:
         return None
 
+def image_hash(raw):
+    # Hashing the bytes ourselves keeps Streamlit from hashing the whole upload
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _decode(image_hash, _raw):
+    # cache_data hands every caller its own copy, so drawing on it is safe
+    image = Image.open(io.BytesIO(_raw))
+    image.draft("RGB", (MAX_IMAGE_SIDE, MAX_IMAGE_SIDE))
+    image = image.convert("RGB")
+    image.thumbnail((MAX_IMAGE_SIDE, MAX_IMAGE_SIDE), Image.LANCZOS)
+    return image
+
+def _open_for_ocr(raw):
+    # OCR only needs grayscale: decode straight to L instead of going through
+    # a full-size RGB copy, and let JPEG decode at a reduced scale
+    image = Image.open(io.BytesIO(raw))
+    image.draft("L", (MAX_IMAGE_SIDE, MAX_IMAGE_SIDE))
+    return image.convert("L")
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _ocr(image_hash, _raw):
+    key = f"ocr:{image_hash}"
+    text = get_disk_cache().get(key)
+    if text is None:
+        text = read_screen(_open_for_ocr(_raw))
+        if text is not None:
+            get_disk_cache().set(key, text, expire=DISK_CACHE_TTL)
+    return text
+
+def read_upload(raw):
+    return _ocr(image_hash(raw), raw)
+
+# ================= QUICK ANSWERS =================
+def _quick(screen_type, meaning, happening, risk, steps, clue):
+    return {
+        "screen_type": screen_type,
+        "plain_meaning": meaning,
+        "what_is_happening": happening,
+        "risk_level": risk,
+        "what_to_do_now": steps,
+        "confidence": "high",
+        "visual_clues": [
+            {
+                "label": clue,
+                "severity": "warning"
+            }
+        ]
+    }
+
+# Messages common and clear enough to explain without asking the model
+QUICK_ANSWERS = [
+    (
+        re.compile(r"\b(no internet|you'?re offline|no network connection|check your (internet|network) connection)\b", re.I),
+        _quick(
+            "app",
+            "The screen says your device is not connected to the internet.",
+            "The app could not reach the internet. The screen does not show whether your last action went through.",
+            "medium",
+            [
+                "Check that Wi-Fi or mobile data is turned on",
+                "Move somewhere with a better signal",
+                "Before repeating a payment or message, check whether it already went through"
+            ],
+            "No internet connection message"
+        )
+    ),
+    (
+        re.compile(r"\binsufficient (funds|balance)\b", re.I),
+        _quick(
+            "payment",
+            "The screen says there is not enough money for this payment.",
+            "The bank or app turned down the payment because of the balance shown to it.",
+            "medium",
+            [
+                "Check your account balance and recent transactions",
+                "Add money or choose a different payment method",
+                "Only try the payment again once you are sure it did not go through"
+            ],
+            "Insufficient funds message"
+        )
+    ),
+    (
+        re.compile(r"\b(session (has )?(expired|timed out)|you have been (logged|signed) out)\b", re.I),
+        _quick(
+            "app",
+            "The screen says you have been signed out.",
+            "The app ended your session and is asking you to sign in again.",
+            "low",
+            [
+                "Sign in again",
+                "Check whether your last action was completed before repeating it"
+            ],
+            "Session ended message"
+        )
+    ),
+    (
+        re.compile(r"\b(incorrect|wrong|invalid) (password|pin|passcode)\b", re.I),
+        _quick(
+            "app",
+            "The screen says the password or PIN was not accepted.",
+            "What was typed does not match what the app expects.",
+            "medium",
+            [
+                "Type it again slowly and check for caps lock",
+                "Avoid many attempts in a row, as the account may get locked",
+                "Use the \"Forgot password\" option if you are not sure"
+            ],
+            "Wrong password or PIN message"
+        )
+    )
+]
+
+# Only short screens that are mostly the message itself; longer text (help
+# pages, terms) can mention the same words without showing the error
+QUICK_MAX_CHARS = 120
+QUICK_MIN_COVER = 1 / 3
+
+def _letters(text):
+    return sum(ch.isalnum() for ch in text)
+
+def quick_answer(screen_texts, user_note):
+    # Only for a single screenshot with no note; several screens or the
+    # user's own words need the full story
+    if len(screen_texts) != 1 or not screen_texts[0] or user_note.strip():
+        return None
+
+    text = screen_texts[0]
+    total = _letters(text)
+    if total > QUICK_MAX_CHARS:
+        return None
+
+    for pattern, answer in QUICK_ANSWERS:
+        covered = sum(_letters(m.group(0)) for m in pattern.finditer(text))
+        if covered and covered >= total * QUICK_MIN_COVER:
+            return answer
+    return None
+
 # ================= AI CORE =================
-def interpret(screen_text, user_note):
-    if not screen_text and not user_note.strip():
+_CODE_FENCE = re.compile(r"^```(?:json)?|```$", re.M)
+
+def parse_answer(content):
+    try:
+        return orjson.loads(content)
+    except orjson.JSONDecodeError:
+        pass
+
+    # Salvage near-misses (code fences, trailing commas, bare keys) rather
+    # than throwing away a whole completion
+    content = _CODE_FENCE.sub("", content).strip()
+    try:
+        return orjson.loads(content)
+    except orjson.JSONDecodeError:
+        import json5
+        return json5.loads(content)
+
+def interpret(screen_texts, user_note, progress=None):
+    if not any(screen_texts) and not user_note.strip():
         return {
             "screen_type": "unknown",
             "plain_meaning": "No clear message found on the screen",
@@ -96,25 +514,35 @@ def interpret(screen_text, user_note):
             ]
         }
 
-    content = ""
-    if screen_text:
-        content += f"SCREEN TEXT:\n{screen_text}\n\n"
+    quick = quick_answer(screen_texts, user_note)
+    if quick is not None:
+        return quick
+
+    evidence = ""
+    for i, screen_text in enumerate(screen_texts, 1):
+        evidence += f"SCREENSHOT {i}:\n{screen_text or '(no readable text)'}\n\n"
     if user_note.strip():
-        content += f"USER INTENT:\n{user_note}\n\n"
-
-    response = llm.chat.completions.create(
-        model="llama-3.1-8b-instant",
-        messages=[
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": content}
-        ],
-        temperature=0,
-        max_tokens=600
-    )
+        evidence += f"USER INTENT:\n{user_note}\n\n"
+    content = USER_PREAMBLE + evidence
+    key = prompt_key(content)
+
+    # Exact repeats are answered from disk before paying for an embedding
+    cached = get_disk_cache().get(_disk_key(key))
+    if cached is not None:
+        return cached
 
+    # Embed only the evidence; the shared preamble would inflate similarity
+    vec = _embed(evidence)
+    cached = _semantic_lookup(vec)
+    if cached is not None:
+        return cached
+
+    # JSON mode should make parse failures rare; API failures land here too
     try:
-        return json.loads(response.choices[0].message.content)
-    except:
+        # Each screenshot adds its own clues, so the answer grows with them
+        max_tokens = MAX_TOKENS * max(1, len(screen_texts))
+        result = _cached_interpret(key, content, max_tokens, progress)
+    except (APIError, ValueError):
         return {
             "screen_type": "unknown",
             "plain_meaning": "This screen is unclear",
@@ -133,41 +561,166 @@ def interpret(screen_text, user_note):
             ]
         }
 
+    _semantic_store(vec, result)
+    return result
+
+# ================= PIPELINE =================
+def _with_ctx(fn):
+    # Worker threads need the script context to use st.* and session_state
+    ctx = get_script_run_ctx()
+
+    def run(*args):
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return fn(*args)
+
+    return run
+
+PIPELINE_TIMEOUT = 30
+PROGRESS_POLL = 0.1
+# OCR output without a single word of 3+ letters is stray noise (borders,
+# icons); short real messages like "Declined" still count
+_WORD = re.compile(r"[^\W\d_]{3,}")
+
+# Both pools are shared by all sessions. A job must never wait on another
+# job in its own pool
+@st.cache_resource
+def get_ocr_executor():
+    return ThreadPoolExecutor(max_workers=4)
+
+@st.cache_resource
+def get_llm_executor():
+    # Its own pool, so interpretations never queue behind OCR jobs
+    return ThreadPoolExecutor(max_workers=8)
+
+def _submit(pool, fn, *args):
+    return pool.submit(_with_ctx(fn), *args)
+
+def _has_message(screen_text):
+    return bool(screen_text) and _WORD.search(screen_text) is not None
+
+def _await(job, progress, remaining):
+    # Draws the job's streamed progress from the script thread until it
+    # finishes; on timeout the job is abandoned and can no longer show anything
+    placeholder = st.empty()
+    try:
+        while not job.done():
+            if remaining() <= 0:
+                raise TimeoutError
+            wait([job], timeout=min(PROGRESS_POLL, remaining()))
+            if progress.text:
+                placeholder.markdown(progress.text)
+    finally:
+        placeholder.empty()
+    return job.result()
+
+def analyze(raws, user_note):
+    # Returns the answer and whether it was read from the screenshots.
+    # One deadline for the whole click, however many jobs it waits on
+    deadline = time.monotonic() + PIPELINE_TIMEOUT
+
+    def remaining():
+        return max(0, deadline - time.monotonic())
+
+    # Tesseract releases the GIL, so screenshots are read in parallel
+    ocr_jobs = [_submit(get_ocr_executor(), read_upload, raw) for raw in raws]
+
+    # Speculatively interpret the note while OCR runs; the note-only answer
+    # is kept unless the screenshots turn out to carry a real message. Only
+    # the job whose answer is shown reports progress
+    progress = StreamProgress()
+    prelim_job = None
+    if user_note.strip() or not raws:
+        prelim_progress = None if raws else progress
+        prelim_job = _submit(get_llm_executor(), interpret, [], user_note, prelim_progress)
+
+    # The same noise rule applies with or without a note
+    screen_texts = [job.result(timeout=remaining()) for job in ocr_jobs]
+    screen_texts = [text if _has_message(text) else "" for text in screen_texts]
+    if prelim_job is not None and not any(screen_texts):
+        return _await(prelim_job, progress, remaining), False
+    job = _submit(get_llm_executor(), interpret, screen_texts, user_note, progress)
+    return _await(job, progress, remaining), True
+
 # ================= VISUAL OVERLAY =================
+def _clue_screenshot(clue):
+    # The model sometimes numbers screenshots as strings ("2"); anything
+    # unreadable belongs to the first one
+    try:
+        return int(clue.get("screenshot", 1))
+    except (TypeError, ValueError):
+        return 1
+
+@st.cache_resource(show_spinner=False)
+def _get_font(size=16):
+    # FreeType renders in C; the built-in bitmap font is only a fallback
+    try:
+        return ImageFont.truetype("DejaVuSans.ttf", size)
+    except OSError:
+        return ImageFont.load_default()
+
 def draw_clues(image, clues):
-    draw = ImageDraw.Draw(image)
+    texts = [f"{i}. {c['label']}" for i, c in enumerate(clues, 1)]
+    font = _get_font()
+
+    # One box width for every label, sized from the real text and kept
+    # inside the screenshot
+    boxes = [font.getbbox(t) for t in texts]
+    width = max(right - left for left, _, right, _ in boxes) + 20
+    width = max(1, min(width, image.width - 40))
+
+    # Draw everything on a small transparent layer covering just the labels,
+    # then blend it onto the screenshot once
+    overlay = Image.new("RGBA", (width + 40, 45 * len(texts) + 30), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(overlay)
+    rect, put = draw.rectangle, draw.text
     y = 30
 
-    for i, c in enumerate(clues, 1):
-        text = f"{i}. {c['label']}"
+    for text, (left, top, _, bottom), c in zip(texts, boxes, clues):
         color = (255, 180, 80) if c["severity"] == "warning" else (120, 170, 255)
-        width = len(text) * 9 + 20
 
-        draw.rectangle(
+        rect(
             (20, y - 8, 20 + width, y + 28),
             outline=color,
             width=3
         )
-        draw.text((30, y), text, fill=(0, 0, 0))
+        # Reuse the measured bbox to centre the text in its box
+        put((30 - left, y + 10 - (top + bottom) // 2), text, fill=(0, 0, 0), font=font)
         y += 45
 
+    # Pasting with the layer's own alpha as mask blends it in place, without
+    # an RGBA copy of the whole screenshot
+    image.paste(overlay, (0, 0), overlay)
     return image
 
-# ================= ACTION =================
-if st.button("Explain this screen"):
-    with st.spinner("Interpreting the screen..."):
-        img = None
-        screen_text = None
+@st.cache_data(max_entries=64, show_spinner=False)
+def _render_clues(image_hash, labels_key, _raw, _clues):
+    image = draw_clues(_decode(image_hash, _raw), _clues)
 
-        if uploaded_image:
-            img = Image.open(uploaded_image).convert("RGB")
-            screen_text = read_screen(img)
+    # Fast, light compression is plenty for a throwaway UI image
+    buf = io.BytesIO()
+    image.save(buf, format="PNG", compress_level=1)
+    return buf.getvalue()
 
-        result = interpret(screen_text, user_note)
+def render_clues(raw, clues):
+    return _render_clues(image_hash(raw), orjson.dumps(clues, option=orjson.OPT_SORT_KEYS), raw, clues)
+
+# ================= ACTION =================
+if submitted:
+    with st.spinner("Interpreting the screen..."):
+        raws = [f.getvalue() for f in uploaded_images]
+        try:
+            result, from_screens = analyze(raws, user_note)
+        except TimeoutError:
+            st.error("This is taking too long. Please try again in a moment.")
+            st.stop()
 
     # ===== VISUAL FIRST =====
-    if img and result["visual_clues"]:
-        st.image(draw_clues(img.copy(), result["visual_clues"]), use_column_width=True)
+    # A note-only answer's clues don't point at anything on the screenshots
+    if from_screens:
+        for i, raw in enumerate(raws, 1):
+            clues = [c for c in result["visual_clues"] if _clue_screenshot(c) == i]
+            if clues:
+                st.image(render_clues(raw, clues), use_column_width=True)
 
     # ===== MEANING =====
     st.markdown("### What this screen means")